@@ -0,0 +1,16 @@
+# Hypercorn configuration for production
+# Usage: hypercorn --config file:hypercorn.conf.py main:app
+import os
+
+bind = [os.getenv("BIND", f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', 5000)}")]
+
+# Each worker runs an event loop that overlaps any number of in-flight OpenAI
+# calls. Without REDIS_URL sessions live in process memory, so only scale
+# past one worker once sessions are shared through Redis.
+worker_class = "asyncio"
+workers = int(os.getenv("WEB_CONCURRENCY", 1))
+
+# Keep-alive avoids reconnects (and TIME_WAIT buildup) for chatty clients
+keep_alive_timeout = 5
+
+graceful_timeout = 120
@@ -1,40 +1,395 @@
-from flask import Flask, render_template, jsonify, request, stream_with_context, Response
-from flask_cors import CORS
+from quart import Quart, render_template, jsonify, request, Response
+from quart.json.provider import DefaultJSONProvider
+from quart_cors import cors
+import abc
 import time
 import os
+import sys
+import threading
+import asyncio
+import weakref
+import gzip
+import zlib
+from collections import OrderedDict
+from itertools import islice
 from dotenv import load_dotenv
-from openai import OpenAI
-import json
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+import httpx
+import orjson
 
 # Load environment variables
 load_dotenv()
 
-app = Flask(__name__)
-CORS(app)
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson, used by jsonify and request.get_json"""
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
-# Store chat sessions
-chat_sessions = {}
+app = Quart(__name__)
+app.json = OrjsonProvider(app)
+app = cors(app)
+
+# Initialize OpenAI client
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+_API_KEY_CONFIGURED = bool(OPENAI_API_KEY)
+# Pooled keep-alive HTTP/2 connections, so calls skip the TCP/TLS handshake.
+# DefaultAsyncHttpxClient keeps the SDK's own timeouts and redirect handling
+http_client = DefaultAsyncHttpxClient(
+    limits=httpx.Limits(max_connections=200, max_keepalive_connections=100),
+    http2=True
+)
+client = AsyncOpenAI(api_key=OPENAI_API_KEY, http_client=http_client)
 
 # Configuration
 DEFAULT_MODEL = "gpt-3.5-turbo"  # or "gpt-4" if you have access
 SYSTEM_MESSAGE = "You are ChatGPT, a helpful AI assistant created by OpenAI. You provide accurate, helpful, and friendly responses."
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", 1024))  # Oldest sessions are evicted beyond this
+MAX_HISTORY = int(os.getenv("MAX_HISTORY", 40))  # Messages kept per session
+HISTORY_WINDOW = 20  # Most recent messages sent to OpenAI, to stay within token limits
+REDIS_URL = os.getenv("REDIS_URL")  # Share sessions between workers through Redis
+SESSION_TTL = int(os.getenv("SESSION_TTL", 86400))  # Idle Redis sessions expire after this many seconds
+IDLE_SESSION_AGE = int(os.getenv("IDLE_SESSION_AGE", 3600))  # In-memory sessions idle this long are evicted first
+STREAM_FLUSH_CHARS = 64  # Streamed tokens are coalesced up to this many characters
+STREAM_FLUSH_INTERVAL = 0.025  # ...or for at most this many seconds
+COMPRESS_MIN_SIZE = 1024  # JSON responses from this many bytes are gzipped
+COMPRESS_LEVEL = 6
+SESSIONS_BATCH = 100  # Sessions serialized per streamed chunk of /api/sessions
+
+MODELS = [
+    {
+        "id": "gpt-3.5-turbo",
+        "name": "GPT-3.5 Turbo",
+        "description": "Fast and efficient for most tasks"
+    },
+    {
+        "id": "gpt-4",
+        "name": "GPT-4",
+        "description": "Most capable model, better reasoning"
+    },
+    {
+        "id": "gpt-4-turbo-preview",
+        "name": "GPT-4 Turbo",
+        "description": "Faster GPT-4 with 128K context"
+    }
+]
+
+# Static response bodies, serialized once at startup
+_MODELS_PAYLOAD = orjson.dumps({"models": MODELS}, option=orjson.OPT_SORT_KEYS)
+_HEALTH_STATIC = {
+    "status": "healthy",
+    "openai_configured": _API_KEY_CONFIGURED,
+    "default_model": DEFAULT_MODEL
+}
+
+# System prompt prefix shared by every completion request
+_SYSTEM_MSG = ({"role": "system", "content": SYSTEM_MESSAGE},)
+
+class ChatSession:
+    """
+    Messages of a single chat
+    openai_messages mirrors the last HISTORY_WINDOW messages in the role/content
+    shape OpenAI expects, so requests can be built from it as is.
+    title and last_updated are kept up to date on append so listing sessions
+    never has to scan messages; message_count counts every message ever
+    appended, including trimmed ones, and drives eviction
+    """
+
+    __slots__ = ("messages", "openai_messages", "title", "message_count", "created", "last_updated")
+
+    def __init__(self):
+        self.messages = []
+        self.openai_messages = []
+        self.title = None
+        self.message_count = 0
+        self.created = self.last_updated = time.time()
+
+    def append(self, role, content):
+        """Append a message, dropping the oldest beyond MAX_HISTORY (HISTORY_WINDOW for OpenAI)"""
+        timestamp = time.time()
+        self.messages.append({
+            "role": role,
+            "content": content,
+            "timestamp": timestamp
+        })
+        self.openai_messages.append({"role": role, "content": content})
+        if self.title is None and role == "user":
+            self.title = content[:50]
+        self.message_count += 1
+        self.last_updated = timestamp
+        if len(self.messages) > MAX_HISTORY:
+            del self.messages[:-MAX_HISTORY]
+        if len(self.openai_messages) > HISTORY_WINDOW:
+            del self.openai_messages[:-HISTORY_WINDOW]
+
+class SessionStore(abc.ABC):
+    """
+    Interface for chat session storage
+    Each message is stored as role/content/timestamp; sessions also carry a
+    title, message count and last update time for listing
+    """
+
+    @abc.abstractmethod
+    async def get(self, session_id):
+        """Return the messages of a session, or None if it doesn't exist"""
+
+    @abc.abstractmethod
+    async def history(self, session_id):
+        """Return the last HISTORY_WINDOW messages of a session as role/content dicts"""
+
+    @abc.abstractmethod
+    async def append(self, session_id, role, content):
+        """Append a message to a session, creating the session if needed"""
+
+    @abc.abstractmethod
+    async def sessions(self):
+        """Return metadata of all sessions, most recently updated first"""
+
+    @abc.abstractmethod
+    async def delete(self, session_id):
+        """Delete a session, returning whether it existed"""
+
+    @abc.abstractmethod
+    async def clear(self):
+        """Delete every session"""
+
+    @abc.abstractmethod
+    async def count(self):
+        """Return the number of stored sessions"""
+
+    async def close(self):
+        pass
+
+class MemorySessionStore(SessionStore):
+    """
+    Bounded, thread-safe in-process session store
+    Once maxsize is reached, a session is evicted from the least recently used
+    few: one idle for longer than IDLE_SESSION_AGE if there is one, otherwise
+    the one with the fewest messages for its age, as it is the least likely
+    to be picked up again. Only suitable for a single worker process
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, session_id):
+        """Return a session (or None) and mark it as recently used"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def _setdefault(self, session_id):
+        """Return a session, creating it if it doesn't exist"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                while len(self._sessions) >= self.maxsize:
+                    self._evict()
+                session = self._sessions[session_id] = ChatSession()
+            else:
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def _evict(self):
+        """Drop one session; the caller holds the lock"""
+        now = time.time()
+        # Only the least recently used 5% are considered
+        candidates = list(islice(self._sessions.items(), max(1, len(self._sessions) // 20)))
+        for session_id, session in candidates:
+            if now - session.last_updated > IDLE_SESSION_AGE:
+                break
+        else:
+            session_id, _ = min(
+                candidates,
+                key=lambda item: item[1].message_count / max(now - item[1].created, 1.0)
+            )
+        del self._sessions[session_id]
+
+    async def get(self, session_id):
+        session = self._get(session_id)
+        return session.messages if session is not None else None
+
+    async def history(self, session_id):
+        # The session's own list, already bounded; callers copy it into requests
+        session = self._get(session_id)
+        return session.openai_messages if session is not None else []
+
+    async def append(self, session_id, role, content):
+        self._setdefault(session_id).append(role, content)
+
+    async def sessions(self):
+        with self._lock:
+            items = list(self._sessions.items())
+        sessions = [
+            {
+                "id": session_id,
+                "title": session.title or "New Chat",
+                # Messages still retained, matching GET /api/sessions/<id>
+                "message_count": len(session.messages),
+                "last_updated": session.last_updated
+            }
+            for session_id, session in items
+            if session.message_count
+        ]
+        sessions.sort(key=lambda x: x["last_updated"], reverse=True)
+        return sessions
+
+    async def delete(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    async def clear(self):
+        with self._lock:
+            self._sessions.clear()
+
+    async def count(self):
+        return len(self._sessions)
+
+class RedisSessionStore(SessionStore):
+    """
+    Session store shared by every worker through Redis
+    Per session:
+        chat:<id>:msgs    list of JSON messages, trimmed to MAX_HISTORY
+        chat:<id>:openai  list of JSON role/content messages, trimmed to HISTORY_WINDOW
+        chat:<id>:meta    hash of title, message_count, last_updated
+    Every session key ends in a fixed suffix, so no session id (even one
+    containing ':') can address another session's keys.
+    chatidx:sessions is a sorted set of session ids scored by last update,
+    kept outside the chat: prefix so no session id can reach it.
+    Session keys expire after SESSION_TTL seconds without activity; run Redis
+    with `maxmemory-policy allkeys-lru` to bound memory as well
+    """
+
+    INDEX_KEY = "chatidx:sessions"
+
+    def __init__(self, url, ttl):
+        from redis import asyncio as aioredis
+
+        self.ttl = ttl
+        # from_url() gives the client ownership of its connection pool, so
+        # close() disconnects the pool too
+        self._redis = aioredis.from_url(url, decode_responses=True)
+
+    @staticmethod
+    def _keys(session_id):
+        key = f"chat:{session_id}"
+        return f"{key}:msgs", f"{key}:openai", f"{key}:meta"
+
+    async def get(self, session_id):
+        key, _, _ = self._keys(session_id)
+        messages = await self._redis.lrange(key, 0, -1)
+        return [orjson.loads(m) for m in messages] if messages else None
+
+    async def history(self, session_id):
+        _, openai_key, _ = self._keys(session_id)
+        messages = await self._redis.lrange(openai_key, 0, -1)
+        return [orjson.loads(m) for m in messages]
+
+    async def append(self, session_id, role, content):
+        key, openai_key, meta_key = self._keys(session_id)
+        timestamp = time.time()
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(key, orjson.dumps({"role": role, "content": content, "timestamp": timestamp}))
+            pipe.ltrim(key, -MAX_HISTORY, -1)
+            pipe.rpush(openai_key, orjson.dumps({"role": role, "content": content}))
+            pipe.ltrim(openai_key, -HISTORY_WINDOW, -1)
+            if role == "user":
+                pipe.hsetnx(meta_key, "title", content[:50])
+            pipe.hincrby(meta_key, "message_count", 1)
+            pipe.hset(meta_key, "last_updated", timestamp)
+            for k in (key, openai_key, meta_key):
+                pipe.expire(k, self.ttl)
+            pipe.zadd(self.INDEX_KEY, {session_id: timestamp})
+            await pipe.execute()
+
+    async def _prune(self):
+        """Drop index entries whose session keys have expired"""
+        await self._redis.zremrangebyscore(self.INDEX_KEY, "-inf", time.time() - self.ttl)
+
+    async def sessions(self):
+        await self._prune()
+        session_ids = await self._redis.zrevrange(self.INDEX_KEY, 0, -1)
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for session_id in session_ids:
+                key, _, meta_key = self._keys(session_id)
+                pipe.hgetall(meta_key)
+                pipe.llen(key)
+            results = await pipe.execute()
+        return [
+            {
+                "id": session_id,
+                "title": meta.get("title") or "New Chat",
+                # Messages still retained, matching GET /api/sessions/<id>
+                "message_count": retained,
+                "last_updated": float(meta["last_updated"])
+            }
+            for session_id, meta, retained in zip(session_ids, results[::2], results[1::2])
+            if meta
+        ]
+
+    async def delete(self, session_id):
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.delete(*self._keys(session_id))
+            pipe.zrem(self.INDEX_KEY, session_id)
+            deleted, _ = await pipe.execute()
+        return deleted > 0
+
+    async def clear(self):
+        keys = [key async for key in self._redis.scan_iter(match="chat:*", count=500)]
+        for start in range(0, len(keys), 500):
+            await self._redis.delete(*keys[start:start + 500])
+        await self._redis.delete(self.INDEX_KEY)
+
+    async def count(self):
+        await self._prune()
+        return await self._redis.zcard(self.INDEX_KEY)
+
+    async def close(self):
+        await self._redis.aclose()
+
+# Turns on the same session run one at a time, so a second message can't
+# interleave with a reply that is still being generated. Locks live only as
+# long as someone holds or waits on them, and are per worker process
+_session_locks = weakref.WeakValueDictionary()
+
+def session_lock(session_id):
+    """Return the lock serializing turns of a session"""
+    lock = _session_locks.get(session_id)
+    if lock is None:
+        lock = _session_locks[session_id] = asyncio.Lock()
+    return lock
+
+# Store chat sessions in Redis when configured, otherwise in process memory
+if REDIS_URL:
+    chat_sessions = RedisSessionStore(REDIS_URL, SESSION_TTL)
+else:
+    chat_sessions = MemorySessionStore(MAX_SESSIONS)
 
 @app.route("/")
-def home():
+async def home():
     """Serve the main HTML page"""
-    return render_template("index.html")
+    return await render_template("index.html")
 
 @app.route("/api/chat", methods=["POST"])
-def chat():
+async def chat():
     """
     Main chat endpoint with OpenAI integration
     Supports both streaming and non-streaming responses
     """
     try:
-        data = request.json
+        data = await request.get_json()
         question = data.get("question", "").strip()
         session_id = data.get("session_id", "default")
         stream = data.get("stream", False)
@@ -43,38 +398,33 @@ def chat():
         if not question:
             return jsonify({"error": "Question is required"}), 400
         
+        # Session ids key the per-session locks and the store, so they must be strings
+        if not isinstance(session_id, str):
+            return jsonify({"error": "session_id must be a string"}), 400
+        
         # Check if OpenAI API key is set
-        if not os.getenv("OPENAI_API_KEY"):
+        if not _API_KEY_CONFIGURED:
             return jsonify({
                 "error": "OpenAI API key not configured. Please set OPENAI_API_KEY in your .env file"
             }), 500
         
-        # Initialize session if it doesn't exist
-        if session_id not in chat_sessions:
-            chat_sessions[session_id] = []
-        
-        # Add user message to session
-        chat_sessions[session_id].append({
-            "role": "user",
-            "content": question,
-            "timestamp": time.time()
-        })
-        
         # Generate response with OpenAI
         if stream:
             return Response(
-                stream_with_context(generate_stream_response(question, session_id, model)),
-                mimetype='text/event-stream'
+                generate_stream_response(question, session_id, model),
+                mimetype='text/event-stream',
+                # Stop nginx and other proxies from buffering the stream
+                headers={'X-Accel-Buffering': 'no', 'Cache-Control': 'no-cache'}
             )
         else:
-            response_text = generate_openai_response(question, session_id, model)
-            
-            # Add assistant message to session
-            chat_sessions[session_id].append({
-                "role": "assistant",
-                "content": response_text,
-                "timestamp": time.time()
-            })
+            async with session_lock(session_id):
+                # Add user message to session (creating it if it doesn't exist)
+                await chat_sessions.append(session_id, "user", question)
+                
+                response_text = await generate_openai_response(question, session_id, model)
+                
+                # Add assistant message to session
+                await chat_sessions.append(session_id, "assistant", response_text)
             
             return jsonify({
                 "success": True,
@@ -99,26 +449,18 @@ def chat():
         else:
             return jsonify({"error": f"An error occurred: {error_message}"}), 500
 
-def generate_openai_response(question, session_id, model):
+async def generate_openai_response(question, session_id, model):
     """
     Generate a response using OpenAI API (non-streaming)
     """
     try:
-        # Prepare messages for OpenAI
-        messages = [
-            {"role": "system", "content": SYSTEM_MESSAGE}
-        ]
-        
-        # Add conversation history (last 20 messages to stay within token limits)
-        history = chat_sessions[session_id][-20:]
-        for msg in history:
-            messages.append({
-                "role": msg["role"],
-                "content": msg["content"]
-            })
+        # Prepare messages for OpenAI, with the conversation history
+        # (last HISTORY_WINDOW messages to stay within token limits)
+        history = await chat_sessions.history(session_id)
+        messages = [*_SYSTEM_MSG, *history]
         
         # Call OpenAI API
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model=model,
             messages=messages,
             temperature=0.7,
@@ -137,149 +479,221 @@ def generate_openai_response(question, session_id, model):
         print(f"OpenAI API Error: {str(e)}")
         raise
 
-def generate_stream_response(question, session_id, model):
+async def coalesce_deltas(stream):
     """
-    Generate a streaming response using OpenAI API
+    Yield the text of a completion stream in batches
+    A batch is sent once it reaches STREAM_FLUSH_CHARS or has been held for
+    STREAM_FLUSH_INTERVAL, whether or not another delta has arrived, and the
+    first delta is sent right away
     """
+    chunks = stream.__aiter__()
+    pending = ""
+    last_flush = float("-inf")
+    # Waiting on the same task across timeouts, rather than wait_for(), keeps
+    # a pause in the model from cancelling a read halfway through
+    next_chunk = asyncio.ensure_future(chunks.__anext__())
     try:
-        # Prepare messages
-        messages = [
-            {"role": "system", "content": SYSTEM_MESSAGE}
-        ]
-        
-        # Add conversation history
-        history = chat_sessions[session_id][-20:]
-        for msg in history:
-            messages.append({
-                "role": msg["role"],
-                "content": msg["content"]
-            })
-        
-        # Call OpenAI API with streaming
-        stream = client.chat.completions.create(
-            model=model,
-            messages=messages,
-            temperature=0.7,
-            max_tokens=2000,
-            stream=True
-        )
-        
-        full_response = ""
+        while True:
+            timeout = None
+            if pending:
+                timeout = max(0.0, STREAM_FLUSH_INTERVAL - (time.monotonic() - last_flush))
+            done, _ = await asyncio.wait((next_chunk,), timeout=timeout)
+            if not done:
+                # The model paused; send what is buffered instead of waiting
+                yield pending
+                pending = ""
+                last_flush = time.monotonic()
+                continue
+            
+            try:
+                chunk = next_chunk.result()
+            except StopAsyncIteration:
+                break
+            next_chunk = asyncio.ensure_future(chunks.__anext__())
+            
+            content = chunk.choices[0].delta.content
+            # Skip role-only and empty deltas
+            if not content:
+                continue
+            pending += content
+            now = time.monotonic()
+            if len(pending) >= STREAM_FLUSH_CHARS or now - last_flush >= STREAM_FLUSH_INTERVAL:
+                yield pending
+                pending = ""
+                last_flush = now
         
-        # Stream the response
-        for chunk in stream:
-            if chunk.choices[0].delta.content is not None:
-                content = chunk.choices[0].delta.content
+        if pending:
+            yield pending
+    finally:
+        next_chunk.cancel()
+
+async def generate_stream_response(question, session_id, model):
+    """
+    Generate a streaming response using OpenAI API
+    """
+    # Send an SSE comment straight away so headers reach the client
+    # before waiting on OpenAI
+    yield b": keepalive\n\n"
+    
+    async with session_lock(session_id):
+        try:
+            # Add user message to session (creating it if it doesn't exist)
+            await chat_sessions.append(session_id, "user", question)
+                
+            # Prepare messages, with the conversation history
+            history = await chat_sessions.history(session_id)
+            messages = [*_SYSTEM_MSG, *history]
+            
+            # Call OpenAI API with streaming
+            stream = await client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=0.7,
+                max_tokens=2000,
+                stream=True
+            )
+            
+            full_response = ""
+            
+            # Stream the response, batching tiny deltas into fewer events
+            async for content in coalesce_deltas(stream):
                 full_response += content
-                yield f"data: {json.dumps({'content': content})}\n\n"
-        
-        # Save complete response to session
-        chat_sessions[session_id].append({
-            "role": "assistant",
-            "content": full_response,
-            "timestamp": time.time()
-        })
+                yield b"data: " + orjson.dumps({"content": content}) + b"\n\n"
+            
+            # Save complete response to session
+            await chat_sessions.append(session_id, "assistant", full_response)
+            
+            yield b"data: " + orjson.dumps({"done": True}) + b"\n\n"
         
-        yield f"data: {json.dumps({'done': True})}\n\n"
-    
-    except Exception as e:
-        error_msg = f"Error: {str(e)}"
-        yield f"data: {json.dumps({'error': error_msg})}\n\n"
+        except Exception as e:
+            error_msg = f"Error: {str(e)}"
+            yield b"data: " + orjson.dumps({"error": error_msg}) + b"\n\n"
+
+def accepts_gzip():
+    """Whether the current request accepts gzip (honouring q=0 refusals)"""
+    return request.accept_encodings["gzip"] > 0
+
+async def gzip_stream(chunks):
+    """Gzip an async stream of bytes, flushing after every chunk so it keeps streaming"""
+    compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
 
 @app.route("/api/sessions", methods=["GET"])
-def get_sessions():
+async def get_sessions():
     """Get all chat sessions"""
-    sessions = []
-    for session_id, messages in chat_sessions.items():
-        if messages:
-            # Find first user message for title
-            first_user_msg = next((m for m in messages if m["role"] == "user"), None)
-            sessions.append({
-                "id": session_id,
-                "title": first_user_msg["content"][:50] if first_user_msg else "New Chat",
-                "message_count": len(messages),
-                "last_updated": messages[-1]["timestamp"]
-            })
+    # Sorted by last updated (most recent first)
+    sessions = await chat_sessions.sessions()
     
-    # Sort by last updated (most recent first)
-    sessions.sort(key=lambda x: x["last_updated"], reverse=True)
-    return jsonify({"sessions": sessions})
+    # Serialize lazily, a batch of sessions at a time, rather than building
+    # the whole document before sending anything. The first batch is encoded
+    # up front to decide whether the body is worth compressing
+    first = b'{"sessions":[' + b",".join(orjson.dumps(s) for s in sessions[:SESSIONS_BATCH])
+    
+    async def generate():
+        yield first
+        for start in range(SESSIONS_BATCH, len(sessions), SESSIONS_BATCH):
+            yield b"," + b",".join(orjson.dumps(s) for s in sessions[start:start + SESSIONS_BATCH])
+        yield b"]}"
+    
+    if len(first) >= COMPRESS_MIN_SIZE and accepts_gzip():
+        response = Response(gzip_stream(generate()), mimetype="application/json")
+        response.headers["Content-Encoding"] = "gzip"
+    else:
+        response = Response(generate(), mimetype="application/json")
+    response.vary.add("Accept-Encoding")
+    return response
 
 @app.route("/api/sessions/<session_id>", methods=["GET"])
-def get_session(session_id):
+async def get_session(session_id):
     """Get specific chat session"""
-    if session_id in chat_sessions:
+    messages = await chat_sessions.get(session_id)
+    if messages is not None:
         return jsonify({
             "session_id": session_id,
-            "messages": chat_sessions[session_id]
+            "messages": messages
         })
     return jsonify({"error": "Session not found"}), 404
 
 @app.route("/api/sessions/<session_id>", methods=["DELETE"])
-def delete_session(session_id):
+async def delete_session(session_id):
     """Delete a chat session"""
-    if session_id in chat_sessions:
-        del chat_sessions[session_id]
+    async with session_lock(session_id):
+        deleted = await chat_sessions.delete(session_id)
+    if deleted:
         return jsonify({"success": True, "message": "Session deleted"})
     return jsonify({"error": "Session not found"}), 404
 
 @app.route("/api/clear", methods=["POST"])
-def clear_all():
+async def clear_all():
     """Clear all sessions"""
-    chat_sessions.clear()
+    await chat_sessions.clear()
     return jsonify({"success": True, "message": "All sessions cleared"})
 
 @app.route("/api/models", methods=["GET"])
-def get_models():
+async def get_models():
     """Get available OpenAI models"""
-    models = [
-        {
-            "id": "gpt-3.5-turbo",
-            "name": "GPT-3.5 Turbo",
-            "description": "Fast and efficient for most tasks"
-        },
-        {
-            "id": "gpt-4",
-            "name": "GPT-4",
-            "description": "Most capable model, better reasoning"
-        },
-        {
-            "id": "gpt-4-turbo-preview",
-            "name": "GPT-4 Turbo",
-            "description": "Faster GPT-4 with 128K context"
-        }
-    ]
-    return jsonify({"models": models})
+    return Response(_MODELS_PAYLOAD, mimetype="application/json")
 
 @app.route("/health")
-def health():
+async def health():
     """Health check endpoint"""
-    api_key_set = bool(os.getenv("OPENAI_API_KEY"))
-    
     return jsonify({
-        "status": "healthy",
-        "sessions": len(chat_sessions),
-        "openai_configured": api_key_set,
-        "default_model": DEFAULT_MODEL
+        **_HEALTH_STATIC,
+        "sessions": await chat_sessions.count()
     })
 
+@app.after_request
+async def compress_response(response):
+    """
+    Gzip JSON responses of at least COMPRESS_MIN_SIZE bytes
+    Streamed bodies have no length up front and are skipped: server-sent
+    events stay uncompressed so they keep flushing, and the session list
+    gzips itself as it streams (see gzip_stream)
+    """
+    if (
+        response.mimetype == "application/json"
+        and response.content_length is not None
+        and response.content_length >= COMPRESS_MIN_SIZE
+        and "Content-Encoding" not in response.headers
+        and accepts_gzip()
+    ):
+        data = await response.get_data()
+        response.set_data(gzip.compress(data, COMPRESS_LEVEL))
+        response.headers["Content-Encoding"] = "gzip"
+        response.vary.add("Accept-Encoding")
+    return response
+
+@app.after_serving
+async def close_clients():
+    """Release pooled OpenAI and session store connections on shutdown"""
+    await client.close()
+    await chat_sessions.close()
+
 @app.errorhandler(404)
-def not_found(error):
+async def not_found(error):
     return jsonify({"error": "Endpoint not found"}), 404
 
 @app.errorhandler(500)
-def internal_error(error):
+async def internal_error(error):
     return jsonify({"error": "Internal server error"}), 500
 
 if __name__ == "__main__":
+    # The built-in server is for local development only
+    if "--dev" not in sys.argv[1:]:
+        raise SystemExit(
+            "Use a production server: hypercorn --config file:hypercorn.conf.py main:app\n"
+            "For local development run: python main.py --dev"
+        )
+    
     print("=" * 70)
     print("🚀 ChatGPT Clone with OpenAI Integration")
     print("=" * 70)
     
     # Check if API key is set
-    api_key = os.getenv("OPENAI_API_KEY")
-    if api_key:
-        print(f"✅ OpenAI API Key: Configured (ends with ...{api_key[-4:]})")
+    if _API_KEY_CONFIGURED:
+        print(f"✅ OpenAI API Key: Configured (ends with ...{OPENAI_API_KEY[-4:]})")
     else:
         print("❌ OpenAI API Key: NOT CONFIGURED")
         print("⚠️  Please set OPENAI_API_KEY in your .env file")
@@ -302,7 +716,7 @@ if __name__ == "__main__":
     print("\nPress CTRL+C to stop the server\n")
     
     app.run(
-        debug=os.getenv("FLASK_DEBUG", "1") == "1",
+        debug=os.getenv("FLASK_DEBUG", "0") == "1",
         host=os.getenv("HOST", "0.0.0.0"),
         port=int(os.getenv("PORT", 5000))
     )
\ No newline at end of file